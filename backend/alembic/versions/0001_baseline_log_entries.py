@@ -0,0 +1,45 @@
+"""baseline log_entries table
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+
+The schema the app used to create with Base.metadata.create_all. Databases
+created that way already have the table, so it is only created when missing
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Offline (--sql) runs can't inspect the database; emit the full DDL
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table('log_entries'):
+        return
+
+    op.create_table(
+        'log_entries',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('correlation_id', sa.String(255), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('log_level', sa.String(50)),
+        sa.Column('api_name', sa.String(255)),
+        sa.Column('service_name', sa.String(255)),
+        sa.Column('session_id', sa.String(255)),
+        sa.Column('log_data', sa.JSON(), nullable=False),
+        sa.Column('error_message', sa.Text()),
+        sa.Column('error_trace', sa.Text()),
+        sa.Column('duration_ms', sa.Integer()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('NOW()')),
+    )
+    for name in ('id', 'correlation_id', 'timestamp', 'log_level', 'api_name', 'service_name', 'session_id'):
+        op.create_index(f'ix_log_entries_{name}', 'log_entries', [name])
+
+
+def downgrade():
+    op.drop_table('log_entries')
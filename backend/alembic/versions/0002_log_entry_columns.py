@@ -0,0 +1,45 @@
+"""add the full log schema columns to log_entries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+
+Columns LogEntryTable gained when the full log schema was folded into it,
+which create_all never added to existing tables. IF NOT EXISTS keeps the
+revision safe on databases created after that change
+"""
+from alembic import op
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = (
+    ('thread', 'VARCHAR(255)'),
+    ('logger', 'VARCHAR(255)'),
+    ('log_type', 'VARCHAR(50)'),
+    ('party_id', 'VARCHAR(255)'),
+    ('url', 'TEXT'),
+    ('has_error', 'BOOLEAN'),
+    ('request_data', 'JSON'),
+    ('response_data', 'JSON'),
+    ('header_log', 'JSON'),
+    ('file_name', 'VARCHAR(255)'),
+)
+
+
+def upgrade():
+    op.execute(
+        "ALTER TABLE log_entries "
+        + ", ".join(f"ADD COLUMN IF NOT EXISTS {name} {type_}" for name, type_ in COLUMNS)
+    )
+
+
+def downgrade():
+    op.execute(
+        "ALTER TABLE log_entries "
+        + ", ".join(f"DROP COLUMN IF EXISTS {name}" for name, _ in COLUMNS)
+    )
@@ -0,0 +1,51 @@
+"""covering and error indexes, mv_logs_daily rollup
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+
+The indexes and materialized view init_db used to create on startup. The
+covering index replaces the plain timestamp index
+"""
+from alembic import op
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("DROP INDEX IF EXISTS ix_log_entries_timestamp")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_log_entries_ts_covering "
+        "ON log_entries (timestamp DESC, api_name, service_name, log_level) "
+        "INCLUDE (duration_ms)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_log_entries_errors "
+        "ON log_entries (api_name, timestamp) WHERE log_level = 'ERROR'"
+    )
+
+    op.execute("""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS mv_logs_daily AS
+        SELECT api_name,
+               date_trunc('day', timestamp) AS day,
+               count(*) AS total,
+               count(*) FILTER (WHERE log_level = 'ERROR') AS errors
+        FROM log_entries
+        GROUP BY 1, 2
+    """)
+    # REFRESH ... CONCURRENTLY needs a unique index on the view
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_mv_logs_daily_api_day "
+        "ON mv_logs_daily (api_name, day)"
+    )
+
+
+def downgrade():
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_logs_daily")
+    op.execute("DROP INDEX IF EXISTS ix_log_entries_errors")
+    op.execute("DROP INDEX IF EXISTS ix_log_entries_ts_covering")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_log_entries_timestamp ON log_entries (timestamp)")
@@ -0,0 +1,173 @@
+"""partition log_entries by month on timestamp
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+
+Rebuilds log_entries as PARTITION BY RANGE (timestamp) with one partition
+per month that has rows. The copy runs in this revision's transaction and
+holds log_entries for as long as it takes
+"""
+from datetime import datetime, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import settings
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = (
+    "id, correlation_id, timestamp, log_level, api_name, service_name, session_id, "
+    "thread, logger, log_type, party_id, url, has_error, request_data, response_data, "
+    "header_log, file_name, log_data, error_message, error_trace, duration_ms, created_at"
+)
+
+TABLE_BODY = """
+    id INTEGER NOT NULL DEFAULT nextval('log_entries_id_seq'),
+    correlation_id VARCHAR(255) NOT NULL,
+    timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    log_level VARCHAR(50),
+    api_name VARCHAR(255),
+    service_name VARCHAR(255),
+    session_id VARCHAR(255),
+    thread VARCHAR(255),
+    logger VARCHAR(255),
+    log_type VARCHAR(50),
+    party_id VARCHAR(255),
+    url TEXT,
+    has_error BOOLEAN,
+    request_data JSON,
+    response_data JSON,
+    header_log JSON,
+    file_name VARCHAR(255),
+    log_data JSON NOT NULL,
+    error_message TEXT,
+    error_trace TEXT,
+    duration_ms INTEGER,
+    created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT NOW()
+"""
+
+
+def _create_indexes():
+    for name in ('id', 'correlation_id', 'log_level', 'api_name', 'service_name', 'session_id'):
+        op.execute(f"CREATE INDEX ix_log_entries_{name} ON log_entries ({name})")
+    op.execute(
+        "CREATE INDEX ix_log_entries_ts_covering "
+        "ON log_entries (timestamp DESC, api_name, service_name, log_level) "
+        "INCLUDE (duration_ms)"
+    )
+    op.execute(
+        "CREATE INDEX ix_log_entries_errors "
+        "ON log_entries (api_name, timestamp) WHERE log_level = 'ERROR'"
+    )
+
+
+def _create_daily_stats():
+    op.execute("""
+        CREATE MATERIALIZED VIEW mv_logs_daily AS
+        SELECT api_name,
+               date_trunc('day', timestamp) AS day,
+               count(*) AS total,
+               count(*) FILTER (WHERE log_level = 'ERROR') AS errors
+        FROM log_entries
+        GROUP BY 1, 2
+    """)
+    op.execute("CREATE UNIQUE INDEX ix_mv_logs_daily_api_day ON mv_logs_daily (api_name, day)")
+
+
+def _detach_old_table(new_name):
+    """
+    Rename log_entries out of the way and free the names the new table
+    needs: its indexes, its primary key and ownership of the id sequence
+    """
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_logs_daily")
+    op.execute(f"ALTER TABLE log_entries RENAME TO {new_name}")
+    op.execute(f"""
+        DO $$
+        DECLARE index_name text;
+        BEGIN
+            FOR index_name IN
+                SELECT i.relname FROM pg_index x
+                JOIN pg_class i ON i.oid = x.indexrelid
+                WHERE x.indrelid = '{new_name}'::regclass AND NOT x.indisprimary
+            LOOP
+                EXECUTE 'DROP INDEX ' || quote_ident(index_name);
+            END LOOP;
+        END $$
+    """)
+    op.execute(f"ALTER TABLE {new_name} DROP CONSTRAINT IF EXISTS log_entries_pkey")
+    op.execute("ALTER SEQUENCE log_entries_id_seq OWNED BY NONE")
+
+
+def upgrade():
+    if op.get_context().as_sql:
+        raise RuntimeError("0004 sizes its partitions from the data it migrates; run it online")
+    bind = op.get_bind()
+
+    relkind = bind.execute(sa.text(
+        "SELECT relkind FROM pg_class WHERE oid = to_regclass('log_entries')"
+    )).scalar()
+    if relkind == 'p':
+        return  # Created partitioned by an earlier create_all
+
+    _detach_old_table('log_entries_unpartitioned')
+
+    op.execute(f"""
+        CREATE TABLE log_entries ({TABLE_BODY},
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """)
+
+    # One partition per month that has rows, plus the current month and the
+    # months kept ahead of it
+    months = set(bind.execute(sa.text(
+        "SELECT DISTINCT date_trunc('month', timestamp) FROM log_entries_unpartitioned"
+    )).scalars())
+    month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    for _ in range(settings.DB_PARTITION_MONTHS_AHEAD + 1):
+        months.add(month)
+        month = (month + timedelta(days=32)).replace(day=1)
+
+    for month in sorted(months):
+        next_month = (month + timedelta(days=32)).replace(day=1)
+        op.execute(
+            f"CREATE TABLE log_entries_{month:%Y_%m} PARTITION OF log_entries "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{next_month:%Y-%m-%d}')"
+        )
+    op.execute("CREATE TABLE log_entries_default PARTITION OF log_entries DEFAULT")
+
+    op.execute(
+        f"INSERT INTO log_entries ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM log_entries_unpartitioned"
+    )
+    op.execute("DROP TABLE log_entries_unpartitioned")
+    op.execute("ALTER SEQUENCE log_entries_id_seq OWNED BY log_entries.id")
+
+    _create_indexes()
+    _create_daily_stats()
+
+
+def downgrade():
+    _detach_old_table('log_entries_partitioned')
+
+    op.execute(f"""
+        CREATE TABLE log_entries ({TABLE_BODY},
+            PRIMARY KEY (id)
+        )
+    """)
+    op.execute(
+        f"INSERT INTO log_entries ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM log_entries_partitioned"
+    )
+    # Dropping the parent drops every partition with it
+    op.execute("DROP TABLE log_entries_partitioned")
+    op.execute("ALTER SEQUENCE log_entries_id_seq OWNED BY log_entries.id")
+
+    _create_indexes()
+    _create_daily_stats()
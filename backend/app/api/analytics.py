@@ -1,18 +1,140 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from typing import Optional, List
-from datetime import datetime, timedelta
-from app.database.connection import get_db
+from typing import Optional, List, Any
+from datetime import datetime, timedelta, timezone
+from app.config import settings
+from app.database.connection import get_read_db, ReadSessionLocal
 from app.core.cache_manager import cache_manager
+from app.core.query_cache import snap_to_bucket
+from app.core.log_parser import log_parser
 from app.database.repositories import LogRepository
 from collections import defaultdict
+import asyncio
+import hashlib
+import json
+import random
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
 
+def _generate_cache_key(endpoint: str, **params) -> str:
+    """
+    Build a cache key for an analytics response
+    Datetimes are snapped to the bucket so pollers passing end_date=now()
+    within the same bucket share one cached result
+    """
+    normalized = {
+        key: snap_to_bucket(value) if isinstance(value, datetime) else value
+        for key, value in params.items()
+    }
+    raw = json.dumps(normalized, sort_keys=True, default=str)
+    return f"analytics:{endpoint}:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+def _cache_in_background(cache_key: str, value: Any):
+    """Write the response to Redis without holding up the request"""
+    ttl = settings.ANALYTICS_CACHE_BUCKET_SECONDS + random.randint(0, 10)
+    asyncio.get_running_loop().run_in_executor(
+        None, cache_manager.set_cached, cache_key, value, ttl
+    )
+
+
+def _split_at_cache_window(start_date: datetime, end_date: datetime):
+    """
+    Persisted logs also stay in Redis for LOG_FILE_RETENTION_DAYS; count them
+    from Redis from that cutoff on and from the database only before it
+    Returns: (cache_start, db_end), db_end None when the range is all cached
+    """
+    cutoff = datetime.now() - timedelta(days=settings.LOG_FILE_RETENTION_DAYS)
+    if start_date.tzinfo is not None:
+        cutoff = cutoff.replace(tzinfo=timezone.utc)
+    if start_date >= cutoff:
+        return start_date, None
+    return cutoff, min(end_date, cutoff - timedelta(microseconds=1))
+
+
+def _cached_logs_since(cache_start: datetime) -> List[dict]:
+    """Cached logs at or after cache_start"""
+    start_ns = log_parser.to_epoch_ns(cache_start)
+    logs = []
+    for log in cache_manager.get_logs_by_pattern("log:*"):
+        try:
+            if log_parser.timestamp_ns(log.get('timestamp', '')) >= start_ns:
+                logs.append(log)
+        except:
+            continue
+    return logs
+
+
+def _with_read_session(func, *args, **kwargs):
+    """Run a repository call on its own pooled read session"""
+    db = ReadSessionLocal()
+    try:
+        return func(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+@router.get("/overview")
+async def get_overview(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+):
+    """
+    Database-side analytics, error stats and daily counts for the dashboard
+    The range is widened to whole days; the three queries run concurrently,
+    each on its own session
+    """
+    try:
+        if not end_date:
+            end_date = datetime.now()
+        if not start_date:
+            start_date = end_date - timedelta(days=7)
+        
+        start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_date = end_date.replace(hour=23, minute=59, second=59, microsecond=999999)
+        
+        cache_key = _generate_cache_key(
+            "overview",
+            start_date=start_date,
+            end_date=end_date
+        )
+        cached = cache_manager.get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        analytics, error_stats, daily_counts = await asyncio.gather(
+            asyncio.to_thread(
+                _with_read_session, LogRepository.get_analytics,
+                start_date=start_date, end_date=end_date
+            ),
+            asyncio.to_thread(
+                _with_read_session, LogRepository.get_error_stats,
+                start_date=start_date, end_date=end_date
+            ),
+            asyncio.to_thread(
+                _with_read_session, LogRepository.get_logs_count_by_date,
+                start_date=start_date, end_date=end_date
+            )
+        )
+        
+        result = {
+            "analytics": analytics,
+            "error_stats": error_stats,
+            "daily_counts": daily_counts
+        }
+        _cache_in_background(cache_key, result)
+        
+        return result
+    
+    except Exception as e:
+        print(f"Error getting analytics overview: {e}")
+        return {"analytics": None, "error_stats": [], "daily_counts": []}
+
+
 @router.get("/stats")
 async def get_dashboard_stats(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     api_name: Optional[str] = None,
@@ -26,28 +148,42 @@ async def get_dashboard_stats(
         if not start_date:
             start_date = end_date - timedelta(days=7)
         
-        # Query cache for recent logs (last 2 days)
-        cache_logs = cache_manager.get_logs_by_pattern("log:*")
-        
-        # Query database for older logs
-        db_logs, _ = LogRepository.get_logs_by_filter(
-            db, 
+        cache_key = _generate_cache_key(
+            "stats",
             start_date=start_date,
             end_date=end_date,
             api_name=api_name,
-            service_name=service_name,
-            limit=10000
+            service_name=service_name
         )
+        cached = cache_manager.get_cached(cache_key)
+        if cached is not None:
+            return cached
         
-        # Combine logs
-        all_logs = cache_logs + db_logs
+        cache_start, db_end = _split_at_cache_window(start_date, end_date)
+        
+        # Query cache for recent logs (last 2 days)
+        cache_logs = cache_manager.get_logs_by_pattern("log:*")
+        
+        # Aggregate older logs in the database instead of pulling rows
+        db_stats = {"total_logs": 0, "error_count": 0}
+        if db_end is not None:
+            db_stats = LogRepository.get_analytics(
+                db,
+                start_date=start_date,
+                end_date=db_end,
+                api_name=api_name,
+                service_name=service_name
+            )
         
         # Filter by date range
         filtered_logs = []
-        for log in all_logs:
+        start_ns = log_parser.to_epoch_ns(cache_start)
+        end_ns = log_parser.to_epoch_ns(end_date)
+        
+        for log in cache_logs:
             try:
-                log_time = datetime.fromisoformat(log.get('timestamp', '').replace('Z', '+00:00'))
-                if start_date <= log_time <= end_date:
+                timestamp_str = log.get('timestamp', '')
+                if start_ns <= log_parser.timestamp_ns(timestamp_str) <= end_ns:
                     if api_name and log.get('apiName') != api_name:
                         continue
                     if service_name and log.get('serviceName') != service_name:
@@ -57,17 +193,20 @@ async def get_dashboard_stats(
                 continue
         
         # Calculate statistics
-        total_logs = len(filtered_logs)
-        error_logs = sum(1 for log in filtered_logs if log.get('logLevel') == 'ERROR')
+        total_logs = len(filtered_logs) + db_stats["total_logs"]
+        error_logs = sum(1 for log in filtered_logs if log.get('logLevel') == 'ERROR') + db_stats["error_count"]
         success_logs = total_logs - error_logs
         success_rate = (success_logs / total_logs * 100) if total_logs > 0 else 0
         
-        return {
+        result = {
             "total_logs": total_logs,
             "success_logs": success_logs,
             "error_logs": error_logs,
             "success_rate": round(success_rate, 2)
         }
+        _cache_in_background(cache_key, result)
+        
+        return result
     
     except Exception as e:
         print(f"Error getting dashboard stats: {e}")
@@ -81,7 +220,7 @@ async def get_dashboard_stats(
 
 @router.get("/logs-per-day")
 async def get_logs_per_day(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     api_name: Optional[str] = None,
@@ -94,32 +233,49 @@ async def get_logs_per_day(
         if not start_date:
             start_date = end_date - timedelta(days=7)
         
-        # Query logs
-        cache_logs = cache_manager.get_logs_by_pattern("log:*")
-        db_logs, _ = LogRepository.get_logs_by_filter(
-            db, 
+        cache_key = _generate_cache_key(
+            "logs-per-day",
             start_date=start_date,
             end_date=end_date,
             api_name=api_name,
-            service_name=service_name,
-            limit=10000
+            service_name=service_name
         )
+        cached = cache_manager.get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Query logs
+        cache_start, db_end = _split_at_cache_window(start_date, end_date)
+        cache_logs = _cached_logs_since(cache_start)
+        db_logs = []
+        if db_end is not None:
+            db_logs = LogRepository.get_log_summaries(
+                db, 
+                start_date=start_date,
+                end_date=db_end,
+                api_name=api_name,
+                service_name=service_name,
+                limit=10000
+            )
         
         all_logs = cache_logs + db_logs
         
         # Group by day
         daily_stats = defaultdict(lambda: {"date": "", "error": 0, "success": 0})
         
+        start_ns = log_parser.to_epoch_ns(start_date)
+        end_ns = log_parser.to_epoch_ns(end_date)
+        
         for log in all_logs:
             try:
-                log_time = datetime.fromisoformat(log.get('timestamp', '').replace('Z', '+00:00'))
-                if start_date <= log_time <= end_date:
+                timestamp_str = log.get('timestamp', '')
+                if start_ns <= log_parser.timestamp_ns(timestamp_str) <= end_ns:
                     if api_name and log.get('apiName') != api_name:
                         continue
                     if service_name and log.get('serviceName') != service_name:
                         continue
                     
-                    day_key = log_time.strftime('%Y-%m-%d')
+                    day_key = log_parser.parse_timestamp(timestamp_str).strftime('%Y-%m-%d')
                     daily_stats[day_key]["date"] = day_key
                     
                     if log.get('logLevel') == 'ERROR':
@@ -131,6 +287,7 @@ async def get_logs_per_day(
         
         # Convert to sorted list
         result = sorted(daily_stats.values(), key=lambda x: x["date"])
+        _cache_in_background(cache_key, result)
         
         return result
     
@@ -141,7 +298,7 @@ async def get_logs_per_day(
 
 @router.get("/error-distribution")
 async def get_error_distribution(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     date: Optional[str] = None,
     api_name: Optional[str] = None,
     service_name: Optional[str] = None
@@ -157,26 +314,43 @@ async def get_error_distribution(
             end_date = datetime.now()
             start_date = end_date.replace(hour=0, minute=0, second=0)
         
-        # Query logs
-        cache_logs = cache_manager.get_logs_by_pattern("log:*")
-        db_logs, _ = LogRepository.get_logs_by_filter(
-            db, 
+        cache_key = _generate_cache_key(
+            "error-distribution",
             start_date=start_date,
             end_date=end_date,
             api_name=api_name,
-            service_name=service_name,
-            limit=10000
+            service_name=service_name
         )
+        cached = cache_manager.get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Query logs
+        cache_start, db_end = _split_at_cache_window(start_date, end_date)
+        cache_logs = _cached_logs_since(cache_start)
+        db_logs = []
+        if db_end is not None:
+            db_logs = LogRepository.get_log_summaries(
+                db, 
+                start_date=start_date,
+                end_date=db_end,
+                api_name=api_name,
+                service_name=service_name,
+                limit=10000
+            )
         
         all_logs = cache_logs + db_logs
         
         # Count errors by service and API
         error_distribution = defaultdict(int)
         
+        start_ns = log_parser.to_epoch_ns(start_date)
+        end_ns = log_parser.to_epoch_ns(end_date)
+        
         for log in all_logs:
             try:
-                log_time = datetime.fromisoformat(log.get('timestamp', '').replace('Z', '+00:00'))
-                if start_date <= log_time <= end_date:
+                timestamp_str = log.get('timestamp', '')
+                if start_ns <= log_parser.timestamp_ns(timestamp_str) <= end_ns:
                     if log.get('logLevel') == 'ERROR':
                         if api_name and log.get('apiName') != api_name:
                             continue
@@ -193,6 +367,7 @@ async def get_error_distribution(
             {"name": key, "value": value}
             for key, value in error_distribution.items()
         ]
+        _cache_in_background(cache_key, result)
         
         return result
     
@@ -203,7 +378,7 @@ async def get_error_distribution(
 
 @router.get("/top-response-time-urls")
 async def get_top_response_time_urls(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     limit: int = Query(default=10, le=50)
@@ -215,24 +390,40 @@ async def get_top_response_time_urls(
         if not start_date:
             start_date = end_date - timedelta(days=7)
         
-        # Query logs
-        cache_logs = cache_manager.get_logs_by_pattern("log:*")
-        db_logs, _ = LogRepository.get_logs_by_filter(
-            db, 
+        cache_key = _generate_cache_key(
+            "top-response-time-urls",
             start_date=start_date,
             end_date=end_date,
-            limit=10000
+            limit=limit
         )
+        cached = cache_manager.get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Query logs
+        cache_start, db_end = _split_at_cache_window(start_date, end_date)
+        cache_logs = _cached_logs_since(cache_start)
+        db_logs = []
+        if db_end is not None:
+            db_logs = LogRepository.get_log_summaries(
+                db, 
+                start_date=start_date,
+                end_date=db_end,
+                limit=10000
+            )
         
         all_logs = cache_logs + db_logs
         
         # Calculate average response time per URL
         url_stats = defaultdict(lambda: {"total_time": 0, "count": 0})
         
+        start_ns = log_parser.to_epoch_ns(start_date)
+        end_ns = log_parser.to_epoch_ns(end_date)
+        
         for log in all_logs:
             try:
-                log_time = datetime.fromisoformat(log.get('timestamp', '').replace('Z', '+00:00'))
-                if start_date <= log_time <= end_date:
+                timestamp_str = log.get('timestamp', '')
+                if start_ns <= log_parser.timestamp_ns(timestamp_str) <= end_ns:
                     url = log.get('url')
                     duration = log.get('durationMs')
                     
@@ -254,8 +445,10 @@ async def get_top_response_time_urls(
         
         # Sort by avg response time descending
         url_avg.sort(key=lambda x: x["avg_response_time"], reverse=True)
+        result = url_avg[:limit]
+        _cache_in_background(cache_key, result)
         
-        return url_avg[:limit]
+        return result
     
     except Exception as e:
         print(f"Error getting top response time URLs: {e}")
@@ -264,7 +457,7 @@ async def get_top_response_time_urls(
 
 @router.get("/url-heat-map")
 async def get_url_heat_map(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     limit: int = Query(default=20, le=100)
@@ -276,24 +469,40 @@ async def get_url_heat_map(
         if not start_date:
             start_date = end_date - timedelta(days=7)
         
-        # Query logs
-        cache_logs = cache_manager.get_logs_by_pattern("log:*")
-        db_logs, _ = LogRepository.get_logs_by_filter(
-            db, 
+        cache_key = _generate_cache_key(
+            "url-heat-map",
             start_date=start_date,
             end_date=end_date,
-            limit=10000
+            limit=limit
         )
+        cached = cache_manager.get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Query logs
+        cache_start, db_end = _split_at_cache_window(start_date, end_date)
+        cache_logs = _cached_logs_since(cache_start)
+        db_logs = []
+        if db_end is not None:
+            db_logs = LogRepository.get_log_summaries(
+                db, 
+                start_date=start_date,
+                end_date=db_end,
+                limit=10000
+            )
         
         all_logs = cache_logs + db_logs
         
         # Count URL access
         url_count = defaultdict(int)
         
+        start_ns = log_parser.to_epoch_ns(start_date)
+        end_ns = log_parser.to_epoch_ns(end_date)
+        
         for log in all_logs:
             try:
-                log_time = datetime.fromisoformat(log.get('timestamp', '').replace('Z', '+00:00'))
-                if start_date <= log_time <= end_date:
+                timestamp_str = log.get('timestamp', '')
+                if start_ns <= log_parser.timestamp_ns(timestamp_str) <= end_ns:
                     url = log.get('url')
                     if url:
                         url_count[url] += 1
@@ -306,8 +515,10 @@ async def get_url_heat_map(
             for url, count in url_count.items()
         ]
         result.sort(key=lambda x: x["count"], reverse=True)
+        result = result[:limit]
+        _cache_in_background(cache_key, result)
         
-        return result[:limit]
+        return result
     
     except Exception as e:
         print(f"Error getting URL heat map: {e}")
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import datetime, timedelta
-from app.database.connection import get_db
+from app.database.connection import get_read_db
 from app.models.query_models import LogFilter, LogResponse
 from app.core.query_engine import query_engine
 from app.core.cache_manager import cache_manager
@@ -13,7 +13,7 @@ router = APIRouter(prefix="/api/logs", tags=["logs"])
 
 @router.get("/", response_model=LogResponse)
 async def get_logs(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     correlation_id: Optional[str] = None,
     api_name: Optional[str] = None,
     service_name: Optional[str] = None,
@@ -22,11 +22,14 @@ async def get_logs(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     limit: int = Query(default=100, le=1000),
-    offset: int = Query(default=0, ge=0)
+    offset: int = Query(default=0, ge=0),
+    cursor_ts: Optional[datetime] = None,
+    cursor_id: Optional[int] = None
 ):
     """
     Get logs with filters
     Returns logs from cache (hot) and/or database (cold) based on date range
+    Pass next_cursor back as cursor_ts/cursor_id to page the database
     """
     try:
         filters = LogFilter(
@@ -38,10 +41,13 @@ async def get_logs(
             start_date=start_date,
             end_date=end_date,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor_ts=cursor_ts,
+            cursor_id=cursor_id
         )
         
         result = query_engine.query_logs(db, filters)
+        
         return result
         
     except Exception as e:
@@ -51,7 +57,7 @@ async def get_logs(
 
 @router.get("/today")
 async def get_today_logs(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     api_name: Optional[str] = None,
     service_name: Optional[str] = None,
     log_level: Optional[str] = Query(default="ERROR"),
@@ -89,7 +95,7 @@ async def get_today_logs(
 
 @router.get("/error-logs")
 async def get_error_logs(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     date: Optional[str] = None,
     api_name: Optional[str] = None,
     service_name: Optional[str] = None,
@@ -137,7 +143,7 @@ async def get_error_logs(
 @router.get("/details/{correlation_id}")
 async def get_log_details(
     correlation_id: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get full log details by correlation ID
@@ -149,11 +155,7 @@ async def get_log_details(
         
         if not log:
             # Fallback to database
-            filters = LogFilter(correlation_id=correlation_id, limit=1)
-            result = query_engine.query_logs(db, filters)
-            
-            if result.logs:
-                log = result.logs[0]
+            log = LogRepository.get_latest_log_by_correlation_id(db, correlation_id)
         
         if not log:
             return {"error": "Log not found", "correlation_id": correlation_id}
@@ -166,7 +168,7 @@ async def get_log_details(
 
 
 @router.get("/filter-options")
-async def get_filter_options(db: Session = Depends(get_db)):
+async def get_filter_options(db: Session = Depends(get_read_db)):
     """
     Get available filter options (API names, service names)
     Used to populate filter dropdowns in UI
@@ -2,11 +2,15 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from typing import List, Dict, Any
 import json
 import asyncio
+import msgspec
 from datetime import datetime
 from app.core.cache_manager import cache_manager
 
 router = APIRouter()
 
+# Reused for every broadcast so its output buffer is allocated once
+_encoder = msgspec.json.Encoder(enc_hook=str)
+
 
 class WebSocketManager:
     def __init__(self):
@@ -48,17 +52,7 @@ class WebSocketManager:
             }
             
             # Broadcast to all connected clients
-            disconnected = []
-            for connection in self.active_connections:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    print(f"Error sending to client: {e}")
-                    disconnected.append(connection)
-            
-            # Remove disconnected clients
-            for conn in disconnected:
-                self.disconnect(conn)
+            await self._send_to_all(message)
                 
         except Exception as e:
             print(f"Error broadcasting log: {e}")
@@ -89,20 +83,27 @@ class WebSocketManager:
                 "stats": self.stats_cache
             }
             
-            disconnected = []
-            for connection in self.active_connections:
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    print(f"Error sending stats to client: {e}")
-                    disconnected.append(connection)
-            
-            for conn in disconnected:
-                self.disconnect(conn)
+            await self._send_to_all(message)
                 
         except Exception as e:
             print(f"Error broadcasting stats: {e}")
     
+    async def _send_to_all(self, message: Dict[str, Any]):
+        """Encode once and send the same text frame to every client"""
+        payload = _encoder.encode(message).decode()
+        
+        disconnected = []
+        for connection in self.active_connections:
+            try:
+                await connection.send_text(payload)
+            except Exception as e:
+                print(f"Error sending to client: {e}")
+                disconnected.append(connection)
+        
+        # Remove disconnected clients
+        for conn in disconnected:
+            self.disconnect(conn)
+    
     def _update_stats(self, log_data: Dict[str, Any]):
         """Update internal stats cache"""
         self.stats_cache["total_logs"] += 1
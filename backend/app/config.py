@@ -5,6 +5,13 @@ import os
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 25
+    DB_MAX_OVERFLOW: int = 25
+    DB_POOL_RECYCLE: int = 1800
+    DB_PARTITION_MONTHS_AHEAD: int = 2
+    DB_PARTITION_CHECK_SECONDS: int = 3600
+    # Logs older than this many days are dropped from the database; 0 keeps them
+    DB_RETENTION_DAYS: int = 0
     
     # Redis
     REDIS_HOST: str
@@ -16,6 +23,10 @@ class Settings(BaseSettings):
     # Log Files
     LOG_BASE_PATH: str
     LOG_FILE_RETENTION_DAYS: int = 2
+    # Parsed timestamps memoized per worker. Each request scans every cached
+    # log in order, so a cache smaller than the logs held in Redis never
+    # hits; 0 turns memoization off
+    TIMESTAMP_CACHE_SIZE: int = 100000
     
     # API
     CORS_ORIGINS: str
@@ -23,7 +34,15 @@ class Settings(BaseSettings):
     # Performance
     MAX_WORKERS: int = 4
     CACHE_TTL: int = 300
-    LOG_BATCH_SIZE: int = 100
+    LOG_BATCH_SIZE: int = 1000
+    LOG_BATCH_MAX_RETRIES: int = 5
+    LOG_BATCH_SECONDS: float = 0.2
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_QUEUE_PUT_TIMEOUT: float = 30
+    # Build cache-only log responses without Pydantic validation
+    TRUST_CACHED_LOGS: bool = True
+    ANALYTICS_CACHE_BUCKET_SECONDS: int = 60
+    DAILY_STATS_REFRESH_SECONDS: int = 60
     
     @property
     def cors_origins_list(self) -> List[str]:
@@ -1,16 +1,32 @@
 import redis
-import json
-from typing import Optional, Dict, Any, List
+import msgpack
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
 from app.config import settings
 
 
+def _encode_default(value: Any) -> Any:
+    """Fallback for types msgpack can't pack natively"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _pack(value: Any) -> bytes:
+    return msgpack.packb(value, default=_encode_default, use_bin_type=True)
+
+
+def _unpack(raw: bytes) -> Any:
+    return msgpack.unpackb(raw, raw=False)
+
+
 class CacheManager:
     def __init__(self):
         self.redis_client = redis.Redis(
             host=settings.REDIS_HOST,
             port=settings.REDIS_PORT,
             db=settings.REDIS_DB,
-            decode_responses=True,
+            decode_responses=False,
             username=settings.REDIS_USER,
             password=settings.REDIS_PASSWORD
         )
@@ -20,8 +36,7 @@ class CacheManager:
         """Store log entry in Redis with correlationId as key"""
         try:
             key = f"log:{correlation_id}"
-            value = json.dumps(log_data, default=str)
-            self.redis_client.setex(key, self.ttl, value)
+            self.redis_client.setex(key, self.ttl, _pack(log_data))
             return True
         except Exception as e:
             print(f"Error caching log {correlation_id}: {e}")
@@ -33,7 +48,7 @@ class CacheManager:
             key = f"log:{correlation_id}"
             data = self.redis_client.get(key)
             if data:
-                return json.loads(data)
+                return _unpack(data)
             return None
         except Exception as e:
             print(f"Error retrieving log {correlation_id}: {e}")
@@ -49,7 +64,7 @@ class CacheManager:
                 for key in keys:
                     data = self.redis_client.get(key)
                     if data:
-                        logs.append(json.loads(data))
+                        logs.append(_unpack(data))
             
             return logs
         except Exception as e:
@@ -97,6 +112,57 @@ class CacheManager:
             print(f"Error searching logs in cache: {e}")
             return []
     
+    def set_cached(self, key: str, value: Any, ttl: int) -> bool:
+        """Store an arbitrary JSON-serializable value (e.g. an API response)"""
+        try:
+            self.redis_client.setex(f"cache:{key}", ttl, _pack(value))
+            return True
+        except Exception as e:
+            print(f"Error caching value {key}: {e}")
+            return False
+    
+    def get_cached(self, key: str) -> Optional[Any]:
+        """Retrieve a value stored with set_cached"""
+        try:
+            data = self.redis_client.get(f"cache:{key}")
+            if data:
+                return _unpack(data)
+            return None
+        except Exception as e:
+            print(f"Error retrieving cached value {key}: {e}")
+            return None
+    
+    def get_versioned(self, key: str, version_key: str) -> Tuple[Optional[int], Optional[Any]]:
+        """
+        Current value of version_key and the value set_versioned stored under
+        key (None if stale), in one MGET round trip
+        Returns: (None, None) if Redis is unreachable
+        """
+        try:
+            version, data = self.redis_client.mget(version_key, f"cache:{key}")
+            version = int(version or 0)
+            if data:
+                stored_version, value = _unpack(data)
+                if stored_version == version:
+                    return version, value
+            return version, None
+        except Exception as e:
+            print(f"Error retrieving cached value {key}: {e}")
+            return None, None
+    
+    def set_versioned(self, key: str, version: int, value: Any, ttl: int) -> bool:
+        """Store a value tagged with the version it was computed at"""
+        return self.set_cached(key, [version, value], ttl)
+    
+    def bump_version(self, version_key: str) -> bool:
+        """Invalidate every cache entry stored under version_key in O(1)"""
+        try:
+            self.redis_client.incr(version_key)
+            return True
+        except Exception as e:
+            print(f"Error bumping {version_key}: {e}")
+            return False
+    
     def delete_log(self, correlation_id: str) -> bool:
         """Delete log entry from Redis"""
         try:
@@ -128,4 +194,5 @@ class CacheManager:
             return False
 
 # Singleton instance
-cache_manager = CacheManager()
\ No newline at end of file
+cache_manager = CacheManager()
+
@@ -1,10 +1,14 @@
 import os
+import asyncio
+import concurrent.futures
 from typing import Dict, Optional, List, Set
 from pathlib import Path
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from app.core.log_parser import log_parser
 from app.core.cache_manager import cache_manager
+from app.database.connection import SessionLocal
+from app.database.repositories import LogRepository
 from app.config import settings
 
 
@@ -30,6 +34,10 @@ class FileWatcher:
         self.observer: Optional[Observer] = None
         self.websocket_manager = None
         self.active_files: Set[str] = set()
+        # Set from the app lifespan; watchdog callbacks run on their own
+        # thread and hand work to the event loop through these
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.log_queue: Optional[asyncio.Queue] = None
     
     def start(self):
         try:
@@ -84,14 +92,19 @@ class FileWatcher:
             if not new_content:
                 return
             
-            self._parse_and_cache_logs(file_path, new_content)
+            self._parse_and_cache_logs(file_path, new_content, persist=True)
             
             self.file_positions[file_path] = new_position
             
         except Exception as e:
             print(f"Error processing file {file_path}: {e}")
     
-    def _parse_and_cache_logs(self, file_path: str, content: str):
+    def _parse_and_cache_logs(self, file_path: str, content: str, persist: bool = False):
+        """
+        Parse complete entries, cache them in Redis and broadcast them
+        Only newly appended content is persisted: the startup scan re-reads
+        whole files and would otherwise insert the same logs on every boot
+        """
         try:
             entries = self._split_log_entries(content)
             
@@ -106,20 +119,94 @@ class FileWatcher:
                     if correlation_id:
                         cache_manager.set_log(correlation_id, log_data)
                         print(f"Cached log: {correlation_id}")
+                        
+                        if persist:
+                            self._enqueue_for_db(log_data)
 
-                        if self.websocket_manager:
-                            try:
-                                import asyncio
-                                loop = asyncio.get_running_loop()
-                                asyncio.create_task(
-                                    self.websocket_manager.broadcast_log(log_data)
-                                )
-                            except RuntimeError:
-                                print(f"No event loop available for WebSocket broadcast")
+                        if self.websocket_manager and self.loop:
+                            asyncio.run_coroutine_threadsafe(
+                                self.websocket_manager.broadcast_log(log_data),
+                                self.loop
+                            )
                 
         except Exception as e:
             print(f"Error parsing and caching logs: {e}")
     
+    def _enqueue_for_db(self, log_data: Dict):
+        """Hand a log to the ingest worker, blocking while the queue is full"""
+        if self.log_queue is None or self.loop is None:
+            return
+        
+        future = asyncio.run_coroutine_threadsafe(
+            self.log_queue.put(log_data), self.loop
+        )
+        try:
+            future.result(timeout=settings.LOG_QUEUE_PUT_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            # Otherwise the put stays pending on the loop and lands later
+            future.cancel()
+            print(f"Ingest queue still full after {settings.LOG_QUEUE_PUT_TIMEOUT}s; log {log_data.get('correlationId')} is in the cache only")
+        except Exception as e:
+            future.cancel()
+            print(f"Error queueing log for database: {e}")
+    
+    async def ingest_worker(self):
+        """
+        Drain the ingest queue into the database, one COPY transaction per
+        LOG_BATCH_SIZE logs or LOG_BATCH_SECONDS, whichever comes first
+        A None on the queue flushes the current batch and stops the worker
+        """
+        loop = asyncio.get_running_loop()
+        stopping = False
+        
+        while not stopping:
+            log_data = await self.log_queue.get()
+            if log_data is None:
+                break
+            
+            batch = [log_data]
+            deadline = loop.time() + settings.LOG_BATCH_SECONDS
+            while len(batch) < settings.LOG_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    log_data = await asyncio.wait_for(self.log_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if log_data is None:
+                    stopping = True
+                    break
+                batch.append(log_data)
+            
+            await self._persist_batch(batch)
+    
+    async def _persist_batch(self, batch: List[Dict]):
+        """
+        Write one batch, retrying it with exponential backoff (1s, 2s, 4s...)
+        up to LOG_BATCH_MAX_RETRIES times while the database is unavailable
+        Rows the database rejects are dropped, not retried
+        """
+        for attempt in range(settings.LOG_BATCH_MAX_RETRIES + 1):
+            if await asyncio.to_thread(self._write_batch, batch):
+                return
+            if attempt < settings.LOG_BATCH_MAX_RETRIES:
+                await asyncio.sleep(2 ** attempt)
+        
+        print(f"Dropping {len(batch)} logs after {settings.LOG_BATCH_MAX_RETRIES} retries; they remain in the cache only")
+    
+    @staticmethod
+    def _write_batch(batch: List[Dict]) -> bool:
+        db = SessionLocal()
+        try:
+            inserted = LogRepository.bulk_create_log_entries(db, batch)
+            if inserted:
+                print(f"Persisted {inserted} logs")
+            # None: the database was unavailable and the batch can be retried
+            return inserted is not None
+        finally:
+            db.close()
+    
     def _split_log_entries(self, content: str) -> List[str]:
         entries = []
         current_entry = []
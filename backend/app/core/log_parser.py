@@ -1,7 +1,10 @@
 import json
 import re
+import ciso8601
+from functools import lru_cache
 from typing import Optional, Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
+from app.config import settings
 
 
 class LogParser:
@@ -73,13 +76,39 @@ class LogParser:
             return matches[0] == matches[-1]
         return False
     
+    @staticmethod
+    @lru_cache(maxsize=settings.TIMESTAMP_CACHE_SIZE)
+    def parse_timestamp(timestamp_str: str) -> datetime:
+        """
+        Parse an ISO-8601 timestamp string
+        Memoized: the endpoints re-scan the same cached logs on every request
+        """
+        return ciso8601.parse_datetime(timestamp_str)
+    
+    @staticmethod
+    def to_epoch_ns(value: datetime) -> int:
+        """Epoch nanoseconds (microsecond precision); naive values are UTC"""
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return round(value.timestamp() * 1_000_000) * 1000
+    
+    @staticmethod
+    @lru_cache(maxsize=settings.TIMESTAMP_CACHE_SIZE)
+    def timestamp_ns(timestamp_str: str) -> int:
+        """
+        Parse an ISO-8601 timestamp string straight to epoch nanoseconds
+        Range checks then compare plain ints, and offset-aware log
+        timestamps compare correctly against naive filter bounds
+        """
+        return LogParser.to_epoch_ns(LogParser.parse_timestamp(timestamp_str))
+    
     @staticmethod
     def extract_timestamp(log_data: Dict[str, Any]) -> Optional[datetime]:
         """Extract and parse timestamp from log data"""
         try:
             timestamp_str = log_data.get('timestamp')
             if timestamp_str:
-                return datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+                return LogParser.parse_timestamp(timestamp_str)
             return None
         except Exception as e:
             print(f"Error parsing timestamp: {e}")
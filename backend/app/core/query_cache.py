@@ -0,0 +1,72 @@
+import functools
+import hashlib
+from datetime import datetime, timedelta
+from typing import Any
+from app.config import settings
+
+
+# Where cached results live; main registers the Redis cache manager at
+# startup. Until then cached functions just run, so importing the
+# repositories never pulls in Redis
+_store = None
+
+# Results read from log_entries are tagged with LOGS_VERSION, results read
+# from mv_logs_daily with DAILY_STATS_VERSION
+LOGS_VERSION = "logs:version"
+DAILY_STATS_VERSION = "daily_stats:version"
+
+
+def configure(store) -> None:
+    """Register the store (get_versioned/set_versioned/bump_version)"""
+    global _store
+    _store = store
+
+
+def snap_to_bucket(value: datetime) -> datetime:
+    """Truncate a datetime to the start of its cache bucket"""
+    bucket = settings.ANALYTICS_CACHE_BUCKET_SECONDS
+    seconds_into_day = value.hour * 3600 + value.minute * 60 + value.second
+    return value.replace(microsecond=0) - timedelta(seconds=seconds_into_day % bucket)
+
+
+def invalidate(version_key: str = LOGS_VERSION) -> None:
+    """Drop every cached result tagged with version_key"""
+    if _store is not None:
+        _store.bump_version(version_key)
+
+
+def _cache_key(prefix: str, args: tuple, kwargs: dict) -> str:
+    """
+    Key for one call; datetimes are snapped to the bucket so callers passing
+    end_date=now() within the same bucket share one result
+    """
+    def normalize(value: Any) -> Any:
+        return snap_to_bucket(value) if isinstance(value, datetime) else value
+    
+    raw = repr((
+        [normalize(value) for value in args],
+        sorted((key, normalize(value)) for key, value in kwargs.items())
+    ))
+    return f"{prefix}:{hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()}"
+
+
+def cached(ttl: int, prefix: str, version_key: str = LOGS_VERSION):
+    """
+    Cache a repository query's result, keyed without the DB session
+    Stored with the version_key value it was computed at; raising stores nothing
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(db, *args, **kwargs):
+            if _store is None:
+                return func(db, *args, **kwargs)
+            
+            key = _cache_key(prefix, args, kwargs)
+            version, result = _store.get_versioned(key, version_key)
+            if result is None:
+                result = func(db, *args, **kwargs)
+                if version is not None:
+                    _store.set_versioned(key, version, result, ttl)
+            return result
+        return wrapper
+    return decorator
@@ -4,6 +4,7 @@ from app.database import repositories
 from sqlalchemy.orm import Session
 from app.models.query_models import LogFilter, LogResponse
 from app.core.cache_manager import cache_manager
+from app.core.log_parser import log_parser
 
 from app.config import settings
 
@@ -49,17 +50,47 @@ class QueryEngine:
                 logs, total = self._query_cache(filters)
                 from_cache = True
                 
-                if total == 0 or total < filters.limit:
+                # Redis keeps one entry per correlation ID and the merge
+                # dedupes on it, so the database could not add anything to
+                # a cache hit
+                if filters.correlation_id:
+                    needs_db = total == 0
+                else:
+                    needs_db = total == 0 or total < filters.limit
+                
+                if needs_db:
                     db_logs, db_total = self._query_db(db, filters)
                     if db_logs:
                         logs, total = self._merge_results(logs, db_logs)
                         from_db = True
             
+            # Hand back a keyset cursor when a full page came from the DB
+            next_cursor = None
+            if from_db and not from_cache and logs and len(logs) == filters.limit:
+                last = logs[-1]
+                if last.get('id') is not None:
+                    next_cursor = {
+                        "cursor_ts": last.get('timestamp'),
+                        "cursor_id": last.get('id')
+                    }
+            
+            # Nothing validated the cached dicts when they were stored; skipping
+            # the check only relies on Redis handing back msgpack-decoded dicts
+            if from_cache and not from_db and settings.TRUST_CACHED_LOGS:
+                return LogResponse.model_construct(
+                    total=total,
+                    logs=logs,
+                    from_cache=from_cache,
+                    from_db=from_db,
+                    next_cursor=next_cursor
+                )
+            
             return LogResponse(
                 total=total,
                 logs=logs,
                 from_cache=from_cache,
-                from_db=from_db
+                from_db=from_db,
+                next_cursor=next_cursor
             )
             
         except Exception as e:
@@ -74,6 +105,10 @@ class QueryEngine:
         if filters.correlation_id:
             return "auto"  # Try cache first, fallback to DB
         
+        # Keyset cursors point at a database row
+        if filters.cursor_ts and filters.cursor_id is not None:
+            return "db_only"
+        
         # If no date range specified, check recent logs (cache)
         if not filters.start_date and not filters.end_date:
             return "cache_only"
@@ -172,16 +207,20 @@ class QueryEngine:
         """Filter logs by date range"""
         filtered = []
         
+        # Bounds converted once; each log is then an int comparison
+        start_ns = log_parser.to_epoch_ns(start_date) if start_date else None
+        end_ns = log_parser.to_epoch_ns(end_date) if end_date else None
+        
         for log in logs:
             try:
                 timestamp_str = log.get('timestamp')
                 if timestamp_str:
-                    timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+                    timestamp_ns = log_parser.timestamp_ns(timestamp_str)
                     
-                    if start_date and timestamp < start_date:
+                    if start_ns is not None and timestamp_ns < start_ns:
                         continue
                     
-                    if end_date and timestamp > end_date:
+                    if end_ns is not None and timestamp_ns > end_ns:
                         continue
                     
                     filtered.append(log)
@@ -1,44 +1,240 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, JSON, Text
+from sqlalchemy import create_engine, make_url, text, Column, Integer, String, DateTime, JSON, Text, Boolean, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql import table, column
 from sqlalchemy.pool import QueuePool
+from alembic import command
+from alembic.config import Config
 from app.config import settings
+from app.core import query_cache
+from datetime import datetime, timedelta
+import orjson
+import os
 
 
+# Plain postgresql:// URLs would pick psycopg2; use the psycopg 3 driver
+database_url = make_url(settings.DATABASE_URL)
+if database_url.drivername == "postgresql":
+    database_url = database_url.set(drivername="postgresql+psycopg")
+
 # Create SQLAlchemy engine
 engine = create_engine(
-    settings.DATABASE_URL,
+    database_url,
     poolclass=QueuePool,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
     pool_pre_ping=True,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    # JSON columns carry whole log payloads; orjson (de)serializes them
+    # several times faster than the stdlib json module
+    json_serializer=lambda value: orjson.dumps(value, default=str).decode(),
+    json_deserializer=orjson.loads,
     echo=False
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False keeps returned rows readable after the session
+# closes without a re-SELECT
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Read-only API requests don't need a transaction: AUTOCOMMIT drops the
+# BEGIN/ROLLBACK round-trips the driver otherwise wraps around each request.
+# Shares the pool with the main engine
+read_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+ReadSessionLocal = sessionmaker(
+    autoflush=False,
+    expire_on_commit=False,
+    bind=read_engine,
+    info={'read_only': True}
+)
 Base = declarative_base()
 
 # Database Models
 class LogEntryTable(Base):
     __tablename__ = "log_entries"
+    # Monthly RANGE partitions (alembic 0004, then ensure_partitions); the
+    # partition key has to be part of the primary key
+    __table_args__ = {'postgresql_partition_by': 'RANGE (timestamp)'}
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     correlation_id = Column(String(255), index=True, nullable=False)
-    timestamp = Column(DateTime, index=True, nullable=False)
+    # Naive UTC: ingest converts offset-aware log timestamps before writing
+    timestamp = Column(DateTime, primary_key=True, nullable=False)
     log_level = Column(String(50), index=True)
     api_name = Column(String(255), index=True)
     service_name = Column(String(255), index=True)
     session_id = Column(String(255), index=True)
+    thread = Column(String(255), nullable=True)
+    logger = Column(String(255), nullable=True)
+    log_type = Column(String(50), nullable=True)
+    party_id = Column(String(255), nullable=True)
+    url = Column(Text, nullable=True)
+    has_error = Column(Boolean, nullable=True)
+    request_data = Column(JSON, nullable=True)
+    response_data = Column(JSON, nullable=True)
+    header_log = Column(JSON, nullable=True)
+    file_name = Column(String(255), nullable=True)
     log_data = Column(JSON, nullable=False)
     error_message = Column(Text, nullable=True)
     error_trace = Column(Text, nullable=True)
     duration_ms = Column(Integer, nullable=True)
     created_at = Column(DateTime, server_default='NOW()')
 
+# Timestamp DESC first so pages skip the sort; the api/service/level keys
+# and the INCLUDE let range queries run as index-only scans
+Index(
+    'ix_log_entries_ts_covering',
+    LogEntryTable.timestamp.desc(),
+    LogEntryTable.api_name,
+    LogEntryTable.service_name,
+    LogEntryTable.log_level,
+    postgresql_using='btree',
+    postgresql_include=['duration_ms']
+)
+
+# Error stats/breakdowns only ever look at ERROR rows; a partial index keeps
+# that scan proportional to the error volume instead of the whole table
+Index(
+    'ix_log_entries_errors',
+    LogEntryTable.api_name,
+    LogEntryTable.timestamp,
+    postgresql_where=LogEntryTable.log_level == 'ERROR'
+)
+
+# Per-day, per-API rollup of log_entries maintained as a materialized view
+# (created by the alembic migrations, see refresh_daily_stats); kept out of
+# Base.metadata, which only describes tables
+daily_stats = table(
+    'mv_logs_daily',
+    column('api_name', String),
+    column('day', DateTime),
+    column('total', Integer),
+    column('errors', Integer)
+)
+
 def get_db():
     """Dependency for FastAPI routes"""
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_read_db():
+    """Dependency for FastAPI routes that only read"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def _next_month(month: datetime) -> datetime:
+    return (month + timedelta(days=32)).replace(day=1)
+
+def _create_partition(connection, month: datetime):
+    """
+    Attach the partition for one month, first moving that month's rows out
+    of the DEFAULT partition (they would make PARTITION OF fail)
+    """
+    name = f"log_entries_{month:%Y_%m}"
+    bounds = {"start": month, "end": _next_month(month)}
+    
+    connection.execute(text(
+        f"CREATE TABLE {name} (LIKE log_entries INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+    ))
+    connection.execute(text(
+        f"WITH moved AS ("
+        f"DELETE FROM log_entries_default "
+        f"WHERE timestamp >= :start AND timestamp < :end RETURNING *"
+        f") INSERT INTO {name} SELECT * FROM moved"
+    ), bounds)
+    connection.execute(text(
+        f"ALTER TABLE log_entries ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{bounds['end']:%Y-%m-%d}')"
+    ))
+
+def ensure_partitions(months_ahead: int = None):
+    """
+    Create log_entries partitions for the current month, months_ahead
+    months out and any month with rows in the DEFAULT partition
+    Each month runs in its own transaction
+    """
+    if months_ahead is None:
+        months_ahead = settings.DB_PARTITION_MONTHS_AHEAD
+    
+    with engine.begin() as connection:
+        relkind = connection.execute(text(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass('log_entries')"
+        )).scalar()
+        if relkind != 'p':
+            print("log_entries is not partitioned yet; run the migrations first")
+            return
+        
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS log_entries_default PARTITION OF log_entries DEFAULT"
+        ))
+        existing = set(connection.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'log_entries'::regclass"
+        )).scalars())
+        months = set(connection.execute(text(
+            "SELECT DISTINCT date_trunc('month', timestamp) FROM log_entries_default"
+        )).scalars())
+    
+    month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    for _ in range(months_ahead + 1):
+        months.add(month)
+        month = _next_month(month)
+    
+    for month in sorted(months):
+        if f"log_entries_{month:%Y_%m}" in existing:
+            continue
+        try:
+            with engine.begin() as connection:
+                _create_partition(connection, month)
+        except Exception as e:
+            print(f"Error creating partition log_entries_{month:%Y_%m}: {e}")
+
+def run_migrations():
+    """Upgrade the schema to the latest alembic revision"""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    config = Config(os.path.join(backend_dir, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(backend_dir, "alembic"))
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+def init_db():
+    """
+    Migrate the schema (tables, indexes, the mv_logs_daily rollup) to the
+    latest revision, then create the upcoming partitions
+    """
+    run_migrations()
+    ensure_partitions()
+    
+    # Refresh planner statistics so new indexes are picked up immediately
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE log_entries"))
+
+def warm_pool():
+    """
+    Open pool_size connections up front so the first requests
+    don't pay the TCP + auth handshake
+    """
+    connections = []
+    try:
+        for _ in range(settings.DB_POOL_SIZE):
+            connection = engine.connect()
+            connection.execute(text("SELECT 1"))
+            connections.append(connection)
+    finally:
+        for connection in connections:
+            connection.close()
+
+def refresh_daily_stats():
+    """
+    Recompute mv_logs_daily without blocking readers, then drop the cached
+    results that were read from the old view contents
+    """
+    with engine.begin() as connection:
+        connection.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_logs_daily"))
+    query_cache.invalidate(query_cache.DAILY_STATS_VERSION)
\ No newline at end of file
@@ -1,9 +1,218 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, func, and_
+import operator
+from functools import lru_cache
+import ciso8601
+import orjson
+import psycopg
+from sqlalchemy.orm import Session, raiseload, defer
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy import desc, func, and_, tuple_, insert, select, bindparam, Integer, text
 from typing import List, Dict, Any, Tuple, Optional
-from datetime import datetime
-from app.database.connection import LogEntryTable
+from datetime import datetime, timedelta, time, timezone
+from app.database.connection import LogEntryTable, daily_stats
+from app.core import query_cache
+from app.core.query_cache import cached
 from app.models.query_models import LogFilter
+from app.models.log_entry import LogEntryDict, LogEntryRecord, LOG_ENTRY_RECORD_FIELDS
+
+
+def _is_connection_error(error: Exception) -> bool:
+    """Failures of the database itself, as opposed to rows it rejects"""
+    if isinstance(error, DBAPIError):
+        return isinstance(error, OperationalError) or error.connection_invalidated
+    # The COPY path talks to the psycopg connection directly
+    return isinstance(error, psycopg.OperationalError)
+
+
+def _json_text(value: Any) -> Optional[str]:
+    """JSON column value as text for COPY"""
+    if value is None:
+        return None
+    return orjson.dumps(value, default=str).decode()
+
+
+# Column values of a LogEntryRecord in LOG_ENTRY_RECORD_FIELDS order, and
+# the position of the JSON payload among them
+_record_values = operator.attrgetter(*LOG_ENTRY_RECORD_FIELDS)
+_LOG_DATA_POSITION = LOG_ENTRY_RECORD_FIELDS.index('log_data')
+
+
+# Columns merged over the stored payload for full-log responses: API field
+# names and one getter that reads all of them in a single call
+_MERGED_KEYS = (
+    'correlationId', 'logLevel', 'apiName', 'serviceName', 'sessionId',
+    'errorMessage', 'errorTrace', 'durationMs'
+)
+_merged_values = operator.attrgetter(
+    'correlation_id', 'log_level', 'api_name', 'service_name', 'session_id',
+    'error_message', 'error_trace', 'duration_ms'
+)
+
+
+# request/response/header JSON lives in log_data only; these columns are
+# no longer written, and full-log queries neither fetch them nor let
+# anything touch them
+_UNUSED_PAYLOAD_COLUMNS = tuple(
+    defer(column, raiseload=True)
+    for column in (LogEntryTable.request_data, LogEntryTable.response_data, LogEntryTable.header_log)
+)
+
+
+# Filterable columns keyed by their LogFilter / bind parameter name
+_FILTER_COLUMNS = {
+    'correlation_id': (LogEntryTable.correlation_id, operator.eq),
+    'api_name': (LogEntryTable.api_name, operator.eq),
+    'service_name': (LogEntryTable.service_name, operator.eq),
+    'log_level': (LogEntryTable.log_level, operator.eq),
+    'session_id': (LogEntryTable.session_id, operator.eq),
+    'start_date': (LogEntryTable.timestamp, operator.ge),
+    'end_date': (LogEntryTable.timestamp, operator.le)
+}
+
+# Scalar columns returned for list pages, labelled with the API field names
+_LIST_COLUMNS = (
+    LogEntryTable.id.label('id'),
+    LogEntryTable.correlation_id.label('correlationId'),
+    LogEntryTable.timestamp.label('timestamp'),
+    LogEntryTable.log_level.label('logLevel'),
+    LogEntryTable.api_name.label('apiName'),
+    LogEntryTable.service_name.label('serviceName'),
+    LogEntryTable.session_id.label('sessionId'),
+    LogEntryTable.has_error.label('hasError'),
+    LogEntryTable.duration_ms.label('durationMs'),
+    LogEntryTable.error_message.label('errorMessage'),
+    LogEntryTable.url.label('url')
+)
+
+
+def _filter_conditions(params: Dict[str, Any]) -> list:
+    """Literal predicates for the filters that are actually set"""
+    return [
+        op(column, params[name])
+        for name, (column, op) in _FILTER_COLUMNS.items()
+        if params[name] is not None
+    ]
+
+
+def _list_row(row) -> LogEntryDict:
+    log_dict = dict(row)
+    log_dict.pop('total', None)
+    if log_dict['timestamp']:
+        log_dict['timestamp'] = log_dict['timestamp'].isoformat()
+    return log_dict
+
+
+
+def _empty_analytics() -> Dict[str, Any]:
+    """AnalyticsResponse-shaped dict with nothing counted yet"""
+    return {
+        "total_logs": 0,
+        "error_count": 0,
+        "api_breakdown": [],
+        "service_breakdown": [],
+        "error_rate": 0.0
+    }
+
+
+def _covers_whole_days(start_date: Optional[datetime], end_date: Optional[datetime]) -> bool:
+    """
+    True when the range starts at midnight and ends on the last microsecond
+    of a day (either side may be open); mv_logs_daily answers exactly those
+    """
+    return (
+        (start_date is None or start_date.time() == time.min)
+        and (end_date is None or end_date.time() == time.max)
+    )
+
+
+def _day_bounds(start_date: Optional[datetime], end_date: Optional[datetime]) -> list:
+    """mv_logs_daily predicates for a whole-day range, end day included"""
+    conditions = []
+    if start_date:
+        conditions.append(daily_stats.c.day >= start_date)
+    if end_date:
+        next_day = datetime.combine(end_date.date(), time.min) + timedelta(days=1)
+        conditions.append(daily_stats.c.day < next_day)
+    return conditions
+
+
+def _timestamp_bounds(start_date: Optional[datetime], end_date: Optional[datetime]) -> list:
+    """log_entries predicates for an exact range"""
+    conditions = []
+    if start_date:
+        conditions.append(LogEntryTable.timestamp >= start_date)
+    if end_date:
+        conditions.append(LogEntryTable.timestamp <= end_date)
+    return conditions
+
+
+# Set once mv_logs_daily has been seen; it is never dropped at runtime
+_daily_stats_available = False
+
+
+def _use_daily_stats(db: Session, start_date: Optional[datetime], end_date: Optional[datetime]) -> bool:
+    """
+    Whether a range can be answered from mv_logs_daily: it must cover whole
+    days and the view must exist
+    """
+    global _daily_stats_available
+    
+    if not _covers_whole_days(start_date, end_date):
+        return False
+    
+    if not _daily_stats_available:
+        try:
+            _daily_stats_available = db.execute(
+                text("SELECT to_regclass('mv_logs_daily') IS NOT NULL")
+            ).scalar()
+        except Exception as e:
+            print(f"Error checking for mv_logs_daily: {e}")
+            db.rollback()
+    
+    return _daily_stats_available
+
+@lru_cache(maxsize=256)
+def _list_statements(fieldset: frozenset) -> Tuple[Any, Any]:
+    """
+    List and count statements for one combination of set filters
+    Built once per combination, with only real predicates so Postgres can
+    plan against the indexes. COUNT(*) OVER () carries the filtered total
+    """
+    predicates = [
+        op(column, bindparam(name, type_=column.type))
+        for name, (column, op) in _FILTER_COLUMNS.items()
+        if name in fieldset
+    ]
+    list_stmt = (
+        select(*_LIST_COLUMNS, func.count().over().label('total'))
+        .where(*predicates)
+        .order_by(desc(LogEntryTable.timestamp), desc(LogEntryTable.id))
+        .limit(bindparam('limit', type_=Integer))
+        .offset(bindparam('offset', type_=Integer))
+    )
+    count_stmt = select(func.count()).select_from(LogEntryTable).where(*predicates)
+    return list_stmt, count_stmt
+
+
+def _set_filters(params: Dict[str, Any]) -> frozenset:
+    return frozenset(name for name in _FILTER_COLUMNS if params[name] is not None)
+
+
+# Unfiltered pages: the newest rows straight off the timestamp index, no count
+_PAGE_STMT = (
+    select(*_LIST_COLUMNS)
+    .order_by(desc(LogEntryTable.timestamp), desc(LogEntryTable.id))
+    .limit(bindparam('limit', type_=Integer))
+    .offset(bindparam('offset', type_=Integer))
+)
+
+# Planner row estimate for log_entries, summed over its partitions (a
+# partitioned parent holds no rows of its own); -1 means never analyzed
+_ESTIMATE_STMT = text(
+    "SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint FROM pg_class c "
+    "WHERE c.oid IN (SELECT inhrelid FROM pg_inherits "
+    "WHERE inhparent = 'log_entries'::regclass) "
+    "OR (c.oid = 'log_entries'::regclass AND c.relkind = 'r')"
+)
 
 
 class LogRepository:
@@ -21,109 +230,189 @@ class LogRepository:
         correlation_id: Optional[str] = None,
         limit: int = 100,
         offset: int = 0
-    ) -> Tuple[List[Dict[str, Any]], int]:
+    ) -> Tuple[List[LogEntryDict], int]:
         """
         Query logs from PostgreSQL with filters
+        Keyset-cursor pages report the page size and unfiltered pages the
+        planner's row estimate as total
         Returns: (list of log dicts, total count)
         """
         try:
-            query = db.query(LogEntryTable)
-            
-            # Apply filters
             if filters:
-                if filters.correlation_id:
-                    query = query.filter(LogEntryTable.correlation_id == filters.correlation_id)
-                
-                if filters.api_name:
-                    query = query.filter(LogEntryTable.api_name == filters.api_name)
-                
-                if filters.service_name:
-                    query = query.filter(LogEntryTable.service_name == filters.service_name)
-                
-                if filters.log_level:
-                    query = query.filter(LogEntryTable.log_level == filters.log_level)
-                
-                if filters.session_id:
-                    query = query.filter(LogEntryTable.session_id == filters.session_id)
-                
-                if filters.start_date:
-                    query = query.filter(LogEntryTable.timestamp >= filters.start_date)
-                
-                if filters.end_date:
-                    query = query.filter(LogEntryTable.timestamp <= filters.end_date)
+                params = {
+                    'correlation_id': filters.correlation_id,
+                    'api_name': filters.api_name,
+                    'service_name': filters.service_name,
+                    'log_level': filters.log_level,
+                    'session_id': filters.session_id,
+                    'start_date': filters.start_date,
+                    'end_date': filters.end_date
+                }
+                limit, offset = filters.limit, filters.offset
             else:
-                # Use individual parameters
-                if correlation_id:
-                    query = query.filter(LogEntryTable.correlation_id == correlation_id)
-                
-                if api_name:
-                    query = query.filter(LogEntryTable.api_name == api_name)
-                
-                if service_name:
-                    query = query.filter(LogEntryTable.service_name == service_name)
-                
-                if log_level:
-                    query = query.filter(LogEntryTable.log_level == log_level)
-                
-                if session_id:
-                    query = query.filter(LogEntryTable.session_id == session_id)
-                
-                if start_date:
-                    query = query.filter(LogEntryTable.timestamp >= start_date)
-                
-                if end_date:
-                    query = query.filter(LogEntryTable.timestamp <= end_date)
+                params = {
+                    'correlation_id': correlation_id,
+                    'api_name': api_name,
+                    'service_name': service_name,
+                    'log_level': log_level,
+                    'session_id': session_id,
+                    'start_date': start_date,
+                    'end_date': end_date
+                }
             
-            # Get total count
-            total = query.count()
+            # Empty values mean "no filter"
+            params = {name: value or None for name, value in params.items()}
+            params['limit'] = limit
+            params['offset'] = offset
             
-            # Apply pagination and ordering
-            if filters:
-                query = query.order_by(desc(LogEntryTable.timestamp))
-                query = query.limit(filters.limit).offset(filters.offset)
-            else:
-                query = query.order_by(desc(LogEntryTable.timestamp))
-                query = query.limit(limit).offset(offset)
+            seek = bool(filters and filters.cursor_ts and filters.cursor_id is not None)
             
-            # Execute query
-            results = query.all()
+            # Only a correlation ID lookup needs the full JSON payload; list
+            # pages select the scalar columns and leave request/response
+            # bodies to /details so they are never detoasted or shipped
+            if params['correlation_id']:
+                return LogRepository._get_full_logs(db, params)
             
-            # Convert to list of dicts
-            logs = []
-            for row in results:
-                log_dict = row.log_data if row.log_data else {}
-                
-                # Ensure required fields
-                log_dict['correlationId'] = row.correlation_id
-                log_dict['timestamp'] = row.timestamp.isoformat() if row.timestamp else None
-                log_dict['logLevel'] = row.log_level
-                log_dict['apiName'] = row.api_name
-                log_dict['serviceName'] = row.service_name
-                log_dict['sessionId'] = row.session_id
-                log_dict['errorMessage'] = row.error_message
-                log_dict['errorTrace'] = row.error_trace
-                log_dict['durationMs'] = row.duration_ms
-                
-                logs.append(log_dict)
+            if seek:
+                # Counting would scan past LIMIT and defeat the seek, so
+                # cursor pages report the page size as total
+                statement = (
+                    select(*_LIST_COLUMNS)
+                    .where(*_filter_conditions(params))
+                    .where(
+                        tuple_(LogEntryTable.timestamp, LogEntryTable.id)
+                        < tuple_(filters.cursor_ts, filters.cursor_id)
+                    )
+                    .order_by(desc(LogEntryTable.timestamp), desc(LogEntryTable.id))
+                    .limit(limit)
+                )
+                logs = [_list_row(row) for row in db.execute(statement).mappings()]
+                return logs, len(logs)
+            
+            if all(params[name] is None for name in _FILTER_COLUMNS):
+                # An exact COUNT(*) over the whole table is a full scan; the
+                # landing page only needs a ballpark total for the pager
+                logs = [_list_row(row) for row in db.execute(_PAGE_STMT, params).mappings()]
+                estimate = db.execute(_ESTIMATE_STMT).scalar() or 0
+                return logs, max(estimate, offset + len(logs))
+            
+            # Labelled columns come back as camelCase mappings with the
+            # window total on every row
+            list_stmt, count_stmt = _list_statements(_set_filters(params))
+            results = db.execute(list_stmt, params).mappings().all()
             
-            return logs, total
+            if results:
+                total = results[0]['total']
+            elif offset > 0:
+                # Paged past the end: no rows to carry the window total
+                total = db.execute(count_stmt, params).scalar()
+            else:
+                total = 0
+            
+            return [_list_row(row) for row in results], total
             
         except Exception as e:
             print(f"Error querying database: {e}")
             return [], 0
     
     @staticmethod
-    def get_error_stats(
+    def _get_full_logs(db: Session, params: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], int]:
+        """Full-payload page for correlation ID lookups"""
+        query = (
+            db.query(LogEntryTable, func.count().over().label('total'))
+            # Nothing may lazy-load per row while the result is serialized
+            .options(raiseload("*"), *_UNUSED_PAYLOAD_COLUMNS)
+            .filter(*_filter_conditions(params))
+            .order_by(desc(LogEntryTable.timestamp), desc(LogEntryTable.id))
+            .limit(params['limit'])
+            .offset(params['offset'])
+        )
+        results = query.all()
+        
+        if results:
+            total = results[0].total
+        elif params['offset'] > 0:
+            _, count_stmt = _list_statements(_set_filters(params))
+            total = db.execute(count_stmt, params).scalar()
+        else:
+            total = 0
+        
+        return [LogRepository._entry_to_dict(row) for row, _ in results], total
+    
+    @staticmethod
+    def _entry_to_dict(row: LogEntryTable) -> Dict[str, Any]:
+        """Full log payload with the indexed columns merged on top"""
+        log_dict = row.log_data if row.log_data else {}
+        
+        # Ensure required fields
+        log_dict.update(zip(_MERGED_KEYS, _merged_values(row)))
+        log_dict['timestamp'] = row.timestamp.isoformat() if row.timestamp else None
+        
+        return log_dict
+    
+    @staticmethod
+    def get_logs_by_correlation_id(db: Session, correlation_id: str) -> List[Dict[str, Any]]:
+        """
+        Full log payloads for one correlation ID, oldest first
+        raiseload("*") makes any future relationship access fail loudly
+        instead of issuing one lazy SELECT per row (N+1)
+        """
+        try:
+            results = (
+                db.query(LogEntryTable)
+                .options(raiseload("*"), *_UNUSED_PAYLOAD_COLUMNS)
+                .filter(LogEntryTable.correlation_id == correlation_id)
+                .order_by(LogEntryTable.timestamp)
+                .all()
+            )
+            
+            return [LogRepository._entry_to_dict(row) for row in results]
+            
+        except Exception as e:
+            print(f"Error querying logs by correlation id: {e}")
+            return []
+    
+    @staticmethod
+    def get_latest_log_by_correlation_id(db: Session, correlation_id: str) -> Optional[Dict[str, Any]]:
+        """Full log payload of the newest entry for one correlation ID"""
+        try:
+            row = (
+                db.query(LogEntryTable)
+                .options(raiseload("*"), *_UNUSED_PAYLOAD_COLUMNS)
+                .filter(LogEntryTable.correlation_id == correlation_id)
+                .order_by(desc(LogEntryTable.timestamp), desc(LogEntryTable.id))
+                .first()
+            )
+            
+            return LogRepository._entry_to_dict(row) if row else None
+            
+        except Exception as e:
+            print(f"Error querying latest log by correlation id: {e}")
+            return None
+    
+    @staticmethod
+    def get_log_summaries(
         db: Session,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
+        end_date: Optional[datetime] = None,
+        api_name: Optional[str] = None,
+        service_name: Optional[str] = None,
+        limit: int = 10000
     ) -> List[Dict[str, Any]]:
-        """Get error statistics grouped by API name"""
+        """
+        Lightweight variant of get_logs_by_filter for analytics
+        Selects only the scalar columns the aggregations read, so the full
+        log_data JSON is never loaded or merged per row
+        """
         try:
             query = db.query(
-                LogEntryTable.api_name,
-                func.count(LogEntryTable.id).label('error_count')
-            ).filter(LogEntryTable.log_level == 'ERROR')
+                LogEntryTable.timestamp.label('timestamp'),
+                LogEntryTable.log_level.label('logLevel'),
+                LogEntryTable.api_name.label('apiName'),
+                LogEntryTable.service_name.label('serviceName'),
+                LogEntryTable.url.label('url'),
+                LogEntryTable.duration_ms.label('durationMs')
+            )
             
             if start_date:
                 query = query.filter(LogEntryTable.timestamp >= start_date)
@@ -131,85 +420,297 @@ class LogRepository:
             if end_date:
                 query = query.filter(LogEntryTable.timestamp <= end_date)
             
-            query = query.group_by(LogEntryTable.api_name)
-            query = query.order_by(desc('error_count'))
+            if api_name:
+                query = query.filter(LogEntryTable.api_name == api_name)
+            
+            if service_name:
+                query = query.filter(LogEntryTable.service_name == service_name)
             
-            results = query.all()
+            query = query.order_by(desc(LogEntryTable.timestamp)).limit(limit)
             
-            stats = [
-                {"api_name": row.api_name, "error_count": row.error_count}
-                for row in results
-            ]
+            summaries = []
+            for row in db.execute(query.statement).mappings():
+                summary = dict(row)
+                if summary['timestamp']:
+                    summary['timestamp'] = summary['timestamp'].isoformat()
+                summaries.append(summary)
             
-            return stats
+            return summaries
             
         except Exception as e:
-            print(f"Error getting error stats: {e}")
+            print(f"Error querying log summaries: {e}")
             return []
     
     @staticmethod
-    def get_logs_count_by_date(
+    def get_analytics(
         db: Session,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
-    ) -> List[Dict[str, Any]]:
-        """Get log counts grouped by date"""
+        end_date: Optional[datetime] = None,
+        api_name: Optional[str] = None,
+        service_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Totals plus per-API and per-service breakdowns in one scan
+        Returns: dict shaped like AnalyticsResponse
+        """
         try:
-            query = db.query(
-                func.date(LogEntryTable.timestamp).label('log_date'),
-                func.count(LogEntryTable.id).label('count')
-            )
-            
-            if start_date:
-                query = query.filter(LogEntryTable.timestamp >= start_date)
-            
-            if end_date:
-                query = query.filter(LogEntryTable.timestamp <= end_date)
+            return LogRepository._query_analytics(db, start_date, end_date, api_name, service_name)
             
-            query = query.group_by('log_date')
-            query = query.order_by('log_date')
+        except Exception as e:
+            print(f"Error getting analytics: {e}")
+            return _empty_analytics()
+    
+    @staticmethod
+    @cached(ttl=30, prefix="repo:analytics")
+    def _query_analytics(
+        db: Session,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        api_name: Optional[str],
+        service_name: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        GROUPING SETS produces every rollup from a single grouped query
+        Raises on failure, so an error result is never cached
+        """
+        query = db.query(
+            LogEntryTable.api_name,
+            LogEntryTable.service_name,
+            func.grouping(LogEntryTable.api_name).label('api_grouped'),
+            func.grouping(LogEntryTable.service_name).label('service_grouped'),
+            func.count().label('count'),
+            func.count().filter(LogEntryTable.log_level == 'ERROR').label('errors'),
+            func.avg(LogEntryTable.duration_ms).label('avg_duration')
+        )
+        
+        if start_date:
+            query = query.filter(LogEntryTable.timestamp >= start_date)
+        
+        if end_date:
+            query = query.filter(LogEntryTable.timestamp <= end_date)
+        
+        if api_name:
+            query = query.filter(LogEntryTable.api_name == api_name)
+        
+        if service_name:
+            query = query.filter(LogEntryTable.service_name == service_name)
+        
+        query = query.group_by(func.grouping_sets(
+            tuple_(LogEntryTable.api_name),
+            tuple_(LogEntryTable.service_name),
+            tuple_()
+        ))
+        
+        analytics = _empty_analytics()
+        
+        # grouping() is 1 for columns rolled up in that row, which tells
+        # the total row apart from a real NULL api/service name
+        for api, service, api_grouped, service_grouped, count, errors, avg_duration in query.all():
+            if api_grouped and service_grouped:
+                analytics["total_logs"] = count
+                analytics["error_count"] = errors
+                continue
             
-            results = query.all()
+            if avg_duration is not None:
+                avg_duration = round(float(avg_duration), 2)
             
-            counts = [
-                {"date": str(row.log_date), "count": row.count}
-                for row in results
-            ]
+            if not api_grouped:
+                analytics["api_breakdown"].append({
+                    "api_name": api, "count": count, "errors": errors, "avg_duration": avg_duration
+                })
+            else:
+                analytics["service_breakdown"].append({
+                    "service_name": service, "count": count, "errors": errors, "avg_duration": avg_duration
+                })
+        
+        if analytics["total_logs"]:
+            analytics["error_rate"] = round(analytics["error_count"] / analytics["total_logs"] * 100, 2)
+        
+        return analytics
+    
+    @staticmethod
+    def get_error_stats(
+        db: Session,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get error statistics grouped by API name
+        Whole-day ranges come from mv_logs_daily and lag inserts by up to
+        DAILY_STATS_REFRESH_SECONDS
+        """
+        try:
+            return LogRepository._query_error_stats(db, start_date, end_date)
             
-            return counts
+        except Exception as e:
+            print(f"Error getting error stats: {e}")
+            return []
+    
+    @staticmethod
+    def _query_error_stats(
+        db: Session,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime]
+    ) -> List[Dict[str, Any]]:
+        """Raises on failure, so an error result is never cached"""
+        if _use_daily_stats(db, start_date, end_date):
+            return LogRepository._query_daily_error_stats(db, start_date, end_date)
+        return LogRepository._query_raw_error_stats(db, start_date, end_date)
+    
+    @staticmethod
+    @cached(ttl=30, prefix="repo:error_stats:daily", version_key=query_cache.DAILY_STATS_VERSION)
+    def _query_daily_error_stats(
+        db: Session,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime]
+    ) -> List[Dict[str, Any]]:
+        """Error counts from mv_logs_daily, cached until the next refresh"""
+        error_count = func.sum(daily_stats.c.errors).label('error_count')
+        query = db.query(daily_stats.c.api_name, error_count)
+        query = query.filter(*_day_bounds(start_date, end_date))
+        query = query.group_by(daily_stats.c.api_name)
+        query = query.having(error_count > 0)
+        query = query.order_by(desc('error_count'))
+        
+        return [
+            {"api_name": row.api_name, "error_count": int(row.error_count)}
+            for row in query.all()
+        ]
+    
+    @staticmethod
+    @cached(ttl=30, prefix="repo:error_stats")
+    def _query_raw_error_stats(
+        db: Session,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime]
+    ) -> List[Dict[str, Any]]:
+        """Error counts from log_entries for ranges the view can't answer"""
+        error_count = func.count().label('error_count')
+        query = db.query(LogEntryTable.api_name, error_count)
+        query = query.filter(LogEntryTable.log_level == 'ERROR')
+        query = query.filter(*_timestamp_bounds(start_date, end_date))
+        query = query.group_by(LogEntryTable.api_name)
+        query = query.order_by(desc('error_count'))
+        
+        return [
+            {"api_name": row.api_name, "error_count": int(row.error_count)}
+            for row in query.all()
+        ]
+    
+    @staticmethod
+    def get_logs_count_by_date(
+        db: Session,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get log counts grouped by date
+        Whole-day ranges come from mv_logs_daily and lag inserts by up to
+        DAILY_STATS_REFRESH_SECONDS
+        """
+        try:
+            return LogRepository._query_logs_count_by_date(db, start_date, end_date)
             
         except Exception as e:
             print(f"Error getting logs count by date: {e}")
             return []
     
+    @staticmethod
+    def _query_logs_count_by_date(
+        db: Session,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime]
+    ) -> List[Dict[str, Any]]:
+        """Raises on failure, so an error result is never cached"""
+        if _use_daily_stats(db, start_date, end_date):
+            return LogRepository._query_daily_logs_count_by_date(db, start_date, end_date)
+        return LogRepository._query_raw_logs_count_by_date(db, start_date, end_date)
+    
+    @staticmethod
+    @cached(ttl=30, prefix="repo:logs_count_by_date:daily", version_key=query_cache.DAILY_STATS_VERSION)
+    def _query_daily_logs_count_by_date(
+        db: Session,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime]
+    ) -> List[Dict[str, Any]]:
+        """Per-day counts from mv_logs_daily, cached until the next refresh"""
+        log_date = daily_stats.c.day.label('log_date')
+        query = db.query(log_date, func.sum(daily_stats.c.total).label('count'))
+        query = query.filter(*_day_bounds(start_date, end_date))
+        query = query.group_by(log_date)
+        query = query.order_by(log_date)
+        
+        return [
+            {"date": str(row.log_date.date()), "count": int(row.count)}
+            for row in query.all()
+        ]
+    
+    @staticmethod
+    @cached(ttl=30, prefix="repo:logs_count_by_date")
+    def _query_raw_logs_count_by_date(
+        db: Session,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime]
+    ) -> List[Dict[str, Any]]:
+        """Per-day counts from log_entries for ranges the view can't answer"""
+        log_date = func.date_trunc('day', LogEntryTable.timestamp).label('log_date')
+        query = db.query(log_date, func.count().label('count'))
+        query = query.filter(*_timestamp_bounds(start_date, end_date))
+        query = query.group_by(log_date)
+        query = query.order_by(log_date)
+        
+        return [
+            {"date": str(row.log_date.date()), "count": int(row.count)}
+            for row in query.all()
+        ]
+    
+    @staticmethod
+    def _to_record(log_data: Dict[str, Any]) -> LogEntryRecord:
+        """Map a parsed log entry onto log_entries column values"""
+        # Stored as naive UTC; ciso8601 handles 'Z' and any offset natively,
+        # and timestamps without an offset are taken as UTC already
+        timestamp_str = log_data.get('timestamp')
+        timestamp = None
+        if timestamp_str:
+            try:
+                timestamp = ciso8601.parse_datetime(timestamp_str)
+            except (TypeError, ValueError):
+                timestamp = None
+        if timestamp is None:
+            timestamp = datetime.now(timezone.utc)
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        
+        response = log_data.get('response')
+        if not isinstance(response, dict):
+            response = {}
+        
+        return LogEntryRecord(
+            correlation_id=log_data.get('correlationId'),
+            timestamp=timestamp,
+            log_data=log_data,
+            log_level=log_data.get('logLevel'),
+            api_name=log_data.get('apiName'),
+            service_name=log_data.get('serviceName'),
+            session_id=log_data.get('sessionId'),
+            thread=log_data.get('thread'),
+            logger=log_data.get('logger'),
+            log_type=log_data.get('type'),
+            party_id=log_data.get('partyId'),
+            url=log_data.get('url'),
+            has_error=response.get('hasError'),
+            file_name=log_data.get('fileName'),
+            error_message=log_data.get('errorMessage'),
+            error_trace=log_data.get('errorTrace'),
+            duration_ms=log_data.get('durationMs')
+        )
+    
     @staticmethod
     def insert_log(db: Session, log_data: Dict[str, Any]) -> bool:
         """Insert a new log entry into database"""
         try:
-            # Parse timestamp
-            timestamp_str = log_data.get('timestamp')
-            timestamp = None
-            if timestamp_str:
-                try:
-                    timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                except:
-                    timestamp = datetime.now()
-            else:
-                timestamp = datetime.now()
-            
-            # Create log entry
-            log_entry = LogEntryTable(
-                correlation_id=log_data.get('correlationId'),
-                timestamp=timestamp,
-                log_level=log_data.get('logLevel'),
-                api_name=log_data.get('apiName'),
-                service_name=log_data.get('serviceName'),
-                session_id=log_data.get('sessionId'),
-                log_data=log_data,
-                error_message=log_data.get('errorMessage'),
-                error_trace=log_data.get('errorTrace'),
-                duration_ms=log_data.get('durationMs')
-            )
+            record = LogRepository._to_record(log_data)
+            log_entry = LogEntryTable(**dict(zip(LOG_ENTRY_RECORD_FIELDS, _record_values(record))))
             
             db.add(log_entry)
             db.commit()
@@ -219,4 +720,128 @@ class LogRepository:
         except Exception as e:
             print(f"Error inserting log: {e}")
             db.rollback()
-            return False
\ No newline at end of file
+            return False
+    
+    @staticmethod
+    def bulk_create_log_entries(db: Session, logs: List[Dict[str, Any]]) -> Optional[int]:
+        """
+        Insert many log entries in one round-trip via COPY ... FROM STDIN
+        Rows the database rejects are isolated by splitting the batch and dropped
+        Returns: number of rows written, or None if the database is unavailable
+        """
+        if not logs:
+            return 0
+        
+        try:
+            records = [LogRepository._to_record(log_data) for log_data in logs]
+            
+            try:
+                LogRepository._write_records(db, records)
+                written = len(records)
+            except Exception as e:
+                if _is_connection_error(e):
+                    raise
+                print(f"Error bulk inserting logs, splitting the batch: {e}")
+                db.rollback()
+                written = LogRepository._write_or_split(db, records)
+            
+            # No invalidate: bumping a version per batch would keep every
+            # cached aggregate cold, so log_entries results age out by TTL
+            db.commit()
+            
+            return written
+            
+        except Exception as e:
+            print(f"Error bulk inserting logs: {e}")
+            db.rollback()
+            return None
+    
+    @staticmethod
+    def _write_or_split(db: Session, records: List[LogEntryRecord]) -> int:
+        """Write records in a savepoint, halving the batch on data errors"""
+        try:
+            with db.begin_nested():
+                LogRepository._write_records(db, records)
+            return len(records)
+        except Exception as e:
+            if _is_connection_error(e):
+                raise
+            if len(records) == 1:
+                print(f"Dropping log {records[0].correlation_id}: {e}")
+                return 0
+            middle = len(records) // 2
+            return (
+                LogRepository._write_or_split(db, records[:middle])
+                + LogRepository._write_or_split(db, records[middle:])
+            )
+    
+    @staticmethod
+    def _write_records(db: Session, records: List[LogEntryRecord]):
+        columns = LOG_ENTRY_RECORD_FIELDS
+        
+        raw_connection = db.connection().connection
+        cursor = raw_connection.cursor()
+        
+        if hasattr(cursor, 'copy'):
+            try:
+                # psycopg 3 adapts and escapes each row itself
+                with cursor.copy(
+                    f"COPY log_entries ({', '.join(columns)}) FROM STDIN"
+                ) as copy:
+                    for record in records:
+                        values = list(_record_values(record))
+                        values[_LOG_DATA_POSITION] = _json_text(values[_LOG_DATA_POSITION])
+                        copy.write_row(values)
+            finally:
+                cursor.close()
+        else:
+            cursor.close()
+            # No COPY support: one multi-row INSERT per chunk keeps the
+            # statement prepared once and skips ORM object construction
+            rows = [dict(zip(columns, _record_values(record))) for record in records]
+            for start in range(0, len(rows), 1000):
+                db.execute(insert(LogEntryTable), rows[start:start + 1000])
+    
+    @staticmethod
+    def delete_old_logs(db: Session, days: int) -> Dict[str, int]:
+        """
+        Remove logs older than the given number of days
+        Whole months before the cutoff are dropped as partitions; the rest
+        is a row-level DELETE
+        """
+        try:
+            cutoff = datetime.now() - timedelta(days=days)
+            
+            partitions = db.execute(text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'log_entries'::regclass"
+            )).scalars().all()
+            
+            dropped = 0
+            for name in partitions:
+                try:
+                    month = datetime.strptime(name, "log_entries_%Y_%m")
+                except ValueError:
+                    continue  # DEFAULT partition
+                
+                # Droppable once the whole month lies before the cutoff
+                next_month = (month + timedelta(days=32)).replace(day=1)
+                if next_month <= cutoff:
+                    db.execute(text(f"ALTER TABLE log_entries DETACH PARTITION {name}"))
+                    db.execute(text(f"DROP TABLE {name}"))
+                    dropped += 1
+            
+            deleted = db.query(LogEntryTable).filter(
+                LogEntryTable.timestamp < cutoff
+            ).delete(synchronize_session=False)
+            
+            db.commit()
+            query_cache.invalidate()
+            
+            return {"partitions_dropped": dropped, "rows_deleted": deleted}
+            
+        except Exception as e:
+            print(f"Error deleting old logs: {e}")
+            db.rollback()
+            return {"partitions_dropped": 0, "rows_deleted": 0}
\ No newline at end of file
@@ -1,29 +1,85 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 
 from app.config import settings
+from app.database.connection import SessionLocal, init_db, warm_pool, refresh_daily_stats, ensure_partitions
+from app.database.repositories import LogRepository
+from app.core.cache_manager import cache_manager
+from app.core import query_cache
 from app.core.file_watcher import file_watcher
 from app.api import logs, analytics, websocket
 from app.api.websocket import websocket_manager
 
 
+async def run_periodically(func, interval: int, name: str):
+    """Run a blocking maintenance job every interval seconds off the event loop"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(func)
+        except Exception as e:
+            print(f"Error running {name}: {e}")
+
+
+def purge_old_logs():
+    """Drop logs older than DB_RETENTION_DAYS from the database"""
+    db = SessionLocal()
+    try:
+        result = LogRepository.delete_old_logs(db, settings.DB_RETENTION_DAYS)
+        print(f"Log retention: {result['partitions_dropped']} partitions dropped, {result['rows_deleted']} rows deleted")
+    finally:
+        db.close()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Startup and shutdown events
     """    
     try:        
+        # Create tables and open pooled connections before the first request
+        try:
+            init_db()
+            warm_pool()
+        except Exception as e:
+            print(f"Database unavailable at startup: {e}")
+        
+        # Cache repository aggregates in Redis
+        query_cache.configure(cache_manager)
+        
         # Connect file watcher to websocket manager
         file_watcher.websocket_manager = websocket_manager
         
+        # Watched logs are queued and written to the database in batches
+        file_watcher.loop = asyncio.get_running_loop()
+        file_watcher.log_queue = asyncio.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+        app.state.log_queue = file_watcher.log_queue
+        ingest_task = asyncio.create_task(file_watcher.ingest_worker())
+        
         # Start file watcher
         file_watcher.start()
         
-        # Scan existing files (synchronous)
-        file_watcher.scan_all_files()
+        # Scan existing files off the event loop so broadcasts can run
+        await asyncio.to_thread(file_watcher.scan_all_files)
         
+        # Keep the mv_logs_daily rollup current, next months' partitions
+        # created ahead of the data that lands in them, and old logs purged
+        maintenance_tasks = [
+            asyncio.create_task(run_periodically(
+                refresh_daily_stats, settings.DAILY_STATS_REFRESH_SECONDS, "daily stats refresh"
+            )),
+            asyncio.create_task(run_periodically(
+                ensure_partitions, settings.DB_PARTITION_CHECK_SECONDS, "partition maintenance"
+            ))
+        ]
+        if settings.DB_RETENTION_DAYS > 0:
+            maintenance_tasks.append(asyncio.create_task(run_periodically(
+                purge_old_logs, settings.DB_PARTITION_CHECK_SECONDS, "log retention"
+            )))
         
     except Exception as e:
         print(f"Error during startup: {e}")
@@ -32,7 +88,13 @@ async def lifespan(app: FastAPI):
     yield
     
     # Shutdown
+    for task in maintenance_tasks:
+        task.cancel()
     file_watcher.stop()
+    
+    # Flush whatever the watcher queued before it stopped
+    await file_watcher.log_queue.put(None)
+    await ingest_task
     print("Application shut down successfully")
 
 # Create FastAPI app
@@ -40,6 +102,7 @@ app = FastAPI(
     title="Log Analyzer API",
     description="AI-Powered Log Analysis System",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional, List, Any, Dict
+import msgspec
+from dataclasses import dataclass, fields
+from typing import Optional, List, Any, Dict, TypedDict
 from datetime import datetime
 from enum import Enum
 
@@ -13,7 +14,10 @@ class RequestType(str, Enum):
     IN = "in"
     OUT = "out"
 
-class HeaderLog(BaseModel):
+# Log structs are decoded once per ingested line; msgspec validates in C
+# and Structs use __slots__. Unknown keys are ignored on decode
+
+class HeaderLog(msgspec.Struct, kw_only=True, omit_defaults=True):
     timestamp: str
     logLevel: str
     application: str
@@ -28,19 +32,18 @@ class HeaderLog(BaseModel):
     host: Optional[str] = None
     screenName: Optional[str] = None
 
-class ResponsePayload(BaseModel):
-    class Config:
-        extra = "allow"
+# Free-form payload: every key is kept
+ResponsePayload = Dict[str, Any]
 
-class Response(BaseModel):
+class Response(msgspec.Struct, kw_only=True, omit_defaults=True):
     code: Optional[str] = None
     message: Optional[str] = None
     extendedMessage: Optional[str] = None
     status: Optional[str] = None
     hasError: Optional[bool] = None
-    responsePayload: Optional[Dict[str, Any]] = None
+    responsePayload: Optional[ResponsePayload] = None
 
-class LogEntry(BaseModel):
+class LogEntry(msgspec.Struct, kw_only=True, omit_defaults=True, frozen=True):
     timestamp: str
     logLevel: str
     apiName: str
@@ -51,12 +54,69 @@ class LogEntry(BaseModel):
     correlationId: str
     type: str
     partyId: Optional[str] = None
-    request: Optional[List[Dict[str, Any]]] = None
-    response: Optional[Response] = None
+    # Bodies stay as undecoded JSON until something asks for them; most
+    # flows only pass them through. An absent body is an empty Raw
+    request: msgspec.Raw = msgspec.Raw()
+    response: msgspec.Raw = msgspec.Raw()
     status: Optional[str] = None
     errorMessage: Optional[str] = None
     errorTrace: Optional[str] = None
     durationMs: Optional[int] = None
     url: Optional[str] = None
     logTime: Optional[str] = None
-    headerlog: Optional[HeaderLog] = None
\ No newline at end of file
+    headerlog: Optional[HeaderLog] = None
+    
+    @property
+    def request_decoded(self) -> Optional[List[Dict[str, Any]]]:
+        return msgspec.json.decode(self.request) if self.request else None
+    
+    @property
+    def response_decoded(self) -> Optional[Response]:
+        return msgspec.json.decode(self.response, type=Optional[Response]) if self.response else None
+
+class LogEntryDict(TypedDict, total=False):
+    """
+    A log as returned by the read paths: plain dicts straight from the
+    cache or DB rows, never rebuilt through a model
+    """
+    id: int
+    correlationId: str
+    timestamp: str
+    logLevel: str
+    apiName: str
+    serviceName: str
+    sessionId: str
+    hasError: Optional[bool]
+    durationMs: Optional[int]
+    errorMessage: Optional[str]
+    errorTrace: Optional[str]
+    url: Optional[str]
+    request: Optional[List[Dict[str, Any]]]
+    response: Optional[Dict[str, Any]]
+
+@dataclass(slots=True)
+class LogEntryRecord:
+    """
+    A parsed log as written to log_entries
+    Plain slotted carrier for the ingestion write path; no validation and
+    no per-instance __dict__
+    """
+    correlation_id: str
+    timestamp: datetime
+    log_data: Dict[str, Any]
+    log_level: Optional[str] = None
+    api_name: Optional[str] = None
+    service_name: Optional[str] = None
+    session_id: Optional[str] = None
+    thread: Optional[str] = None
+    logger: Optional[str] = None
+    log_type: Optional[str] = None
+    party_id: Optional[str] = None
+    url: Optional[str] = None
+    has_error: Optional[bool] = None
+    file_name: Optional[str] = None
+    error_message: Optional[str] = None
+    error_trace: Optional[str] = None
+    duration_ms: Optional[int] = None
+
+LOG_ENTRY_RECORD_FIELDS = tuple(field.name for field in fields(LogEntryRecord))
@@ -1,8 +1,16 @@
-from pydantic import BaseModel, Field
+import msgspec
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List
 from datetime import datetime
 
-class LogFilter(BaseModel):
+MAX_PAGE_SIZE = 1000
+
+class LogFilter(msgspec.Struct, kw_only=True):
+    """
+    Internal query filter, built from route parameters FastAPI has already
+    validated; paging values are clamped rather than rejected
+    Naive start_date/end_date are UTC, like the stored log timestamps
+    """
     correlation_id: Optional[str] = None
     api_name: Optional[str] = None
     service_name: Optional[str] = None
@@ -10,21 +18,39 @@ class LogFilter(BaseModel):
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
     session_id: Optional[str] = None
-    limit: int = Field(default=100, le=1000)
-    offset: int = Field(default=0, ge=0)
+    limit: int = 100
+    offset: int = 0
+    # Keyset pagination: (timestamp, id) of the last row of the previous page
+    cursor_ts: Optional[datetime] = None
+    cursor_id: Optional[int] = None
+    
+    def __post_init__(self):
+        self.limit = max(0, min(MAX_PAGE_SIZE, self.limit))
+        self.offset = max(0, self.offset)
+
+# Response models stay Pydantic so FastAPI documents them, pinned to the
+# cheapest validation settings
+class ResponseModel(BaseModel):
+    model_config = ConfigDict(
+        extra='ignore',
+        validate_assignment=False,
+        populate_by_name=True,
+        str_strip_whitespace=False
+    )
 
-class LogResponse(BaseModel):
+class LogResponse(ResponseModel):
     total: int
     logs: List[dict]
     from_cache: bool
     from_db: bool
+    next_cursor: Optional[dict] = None
 
-class ErrorStatsResponse(BaseModel):
+class ErrorStatsResponse(ResponseModel):
     api_name: str
     error_count: int
     percentage: float
 
-class AnalyticsResponse(BaseModel):
+class AnalyticsResponse(ResponseModel):
     total_logs: int
     error_count: int
     api_breakdown: List[dict]